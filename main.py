@@ -1,21 +1,70 @@
-import json
 import csv
 import random
 import io
 import hashlib
+import pickle
 import time
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from collections import defaultdict, Counter
-from flask import Flask, request, jsonify, render_template, send_file
+import threading
+from collections import OrderedDict, defaultdict
+from flask import Flask, Response, request, jsonify, render_template
 
 # Create the app with explicit template and static folders
 app = Flask(__name__, template_folder="templates", static_folder="static")
 
-# In-memory storage for the API
-competitors_data = {}
-groups_data = {}
-fixed_positions_data = {}
-assignment_results = {}
+
+class LRUCache(OrderedDict):
+    """
+    Dict that keeps at most maxsize entries, evicting the least recently used.
+    """
+
+    def __init__(self, maxsize):
+        super().__init__()
+        self.maxsize = maxsize
+        self._lock = threading.RLock()
+
+    def __getitem__(self, key):
+        with self._lock:
+            value = super().__getitem__(key)
+            self.move_to_end(key)
+            return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            super().__setitem__(key, value)
+            self.move_to_end(key)
+            if len(self) > self.maxsize:
+                self.popitem(last=False)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+# In-memory storage for the API, bounded so old uploads and results are evicted
+competitors_data = LRUCache(maxsize=256)
+competitor_tables = LRUCache(maxsize=256)
+groups_data = LRUCache(maxsize=256)
+fixed_positions_data = LRUCache(maxsize=256)
+assignment_results = LRUCache(maxsize=1024)  # (result, result serialized as JSON)
+
+# n choose 2 for every count a group can hold (capacity is at most 4)
+PAIRS_BY_COUNT = (0, 0, 1, 3, 6)
+
+# Number of draw attempts handed to a worker process at a time
+ATTEMPTS_PER_TASK = 10
+
+# Extra time a draw waits past its deadline for batches that are finishing up
+DRAW_GRACE_SECONDS = 1
+
+# Worker processes shared by all draws, started on first use
+DRAW_POOL = ProcessPoolExecutor(max_workers=os.cpu_count())
+DRAW_POOL_LOCK = threading.Lock()
 
 
 class Competitor:
@@ -26,6 +75,28 @@ class Competitor:
         self.seed_id = seed_id
 
 
+class CompetitorTable:
+    """
+    Column-wise view of the competitors, built once at upload time.
+    Competitor i is names[i]; its country is country_vocab[country_idx[i]].
+    The draw works on country indexes and only maps back to names for output.
+    """
+
+    def __init__(self, competitors):
+        self.names = list(competitors)
+
+        # Countries numbered in order of first appearance
+        country_to_idx = {}
+        self.country_idx = [
+            country_to_idx.setdefault(comp.country, len(country_to_idx))
+            for comp in competitors.values()
+        ]
+        self.country_vocab = list(country_to_idx)
+
+        # competitor_id -> country index
+        self.country_of = dict(zip(self.names, self.country_idx))
+
+
 class Group:
     def __init__(self, id, capacity, label=None):
         self.id = str(id)  # Ensure ID is always a string
@@ -33,14 +104,30 @@ class Group:
         self.label = label
         self.positions = ["a", "b", "c", "d"][:capacity]
         self.assigned_positions = {}  # position -> competitor_id
+        self.free_positions = list(self.positions)  # positions not yet assigned
+
+    def reset(self, initial_assigned=None):
+        """
+        Clear all assignments so the group can be reused for another draw attempt,
+        optionally keeping the given position -> competitor_id assignments.
+        """
+        self.assigned_positions.clear()
+        if initial_assigned:
+            self.assigned_positions.update(initial_assigned)
+        self.free_positions = [
+            pos for pos in self.positions if pos not in self.assigned_positions
+        ]
 
 
 class Assignment:
     def __init__(self):
         self.assignments = {}  # (group_id, position) -> competitor_id
         self.collision_count = 0
-        self.per_country_collisions = defaultdict(int)
+        self.per_country_collisions = {}
         self.random_seed = None
+        # False when a time limit cut the search short, so the same seed
+        # may give a different result next time
+        self.search_complete = True
 
 
 def validate_inputs(competitors, groups, fixed_positions):
@@ -87,33 +174,64 @@ def validate_inputs(competitors, groups, fixed_positions):
     return True, ""
 
 
-def calculate_collisions(assignment, competitors, groups):
+def calculate_collisions(country_group_counts):
     collision_count = 0
-    per_country_collisions = defaultdict(int)
+    per_country_collisions = {}
+
+    # The country -> per-group counts histogram already holds every group's
+    # country tally, so collisions can be read straight off it
+    for country, group_counts in country_group_counts.items():
+        country_pairs = 0
+        for count in group_counts:
+            # For each country with more than 1 competitor, add to collision count
+            if count > 1:
+                # Number of pairs is n choose 2, looked up rather than computed
+                country_pairs += PAIRS_BY_COUNT[count]
 
-    # Group assignments by group
-    group_assignments = defaultdict(list)
-    for (group_id, position), comp_id in assignment.items():
-        group_assignments[group_id].append(comp_id)
+        # Each country is visited once, so its total can be stored directly
+        if country_pairs:
+            collision_count += country_pairs
+            per_country_collisions[country] = country_pairs
 
-    # Count collisions within each group
-    for group_id, comp_ids in group_assignments.items():
-        # Count countries in this group
-        country_counts = Counter(competitors[comp_id].country for comp_id in comp_ids)
+    return collision_count, per_country_collisions
 
-        # For each country with more than 1 competitor, add to collision count
-        for country, count in country_counts.items():
-            if count > 1:
-                # Number of pairs is n choose 2
-                pairs = count * (count - 1) // 2
-                collision_count += pairs
-                per_country_collisions[country] += pairs
 
-    return collision_count, per_country_collisions
+def group_fixed_positions(fixed_positions):
+    """
+    Index fixed positions by group: group_id -> {position: competitor_id}.
+    """
+    fixed_by_group = defaultdict(dict)
+    for comp_name, (group_id, position) in fixed_positions.items():
+        fixed_by_group[str(group_id)][position] = comp_name
+    return fixed_by_group
+
+
+def sort_countries(competitor_table, fixed_positions):
+    """
+    Group the competitors without a fixed position by country, largest country first.
+    Returns a list of (country index, [competitor_id, ...]) pairs.
+    """
+    # Group remaining competitors by country index, keeping countries in order of
+    # first appearance among the remaining competitors so equal-sized countries
+    # stay in the same order for a given seed
+    country_groups = {}
+    for comp_name, country_idx in zip(
+        competitor_table.names, competitor_table.country_idx
+    ):
+        if comp_name not in fixed_positions:
+            country_groups.setdefault(country_idx, []).append(comp_name)
+
+    # Sort countries by number of competitors (descending)
+    return sorted(country_groups.items(), key=lambda x: len(x[1]), reverse=True)
 
 
 def systematic_country_assignment(
-    competitors, groups, fixed_positions, random_seed=None
+    groups,
+    fixed_positions,
+    random_seed,
+    country_of,
+    fixed_by_group,
+    sorted_countries,
 ):
     """
     Systematic algorithm that distributes countries to minimize collisions:
@@ -121,48 +239,45 @@ def systematic_country_assignment(
     2. For each country, distribute its competitors to groups with the fewest competitors from that country
     3. Shuffle positions within each group to ensure fairness
     """
-    if random_seed is not None:
-        random.seed(random_seed)
+    # Private generator so attempts never share or disturb global random state
+    rng = random.Random(random_seed)
 
     assignment = Assignment()
     assignment.random_seed = random_seed
 
-    # First, place fixed positions
+    # First, place fixed positions, clearing anything left from a previous draw
+    for group_id, group in groups.items():
+        group.reset(fixed_by_group.get(group_id))
     for comp_name, (group_id, position) in fixed_positions.items():
         # Convert group_id to string for consistency
-        group_id_str = str(group_id)
-        assignment.assignments[(group_id_str, position)] = comp_name
-        groups[group_id_str].assigned_positions[position] = comp_name
+        assignment.assignments[(str(group_id), position)] = comp_name
 
-    # Get remaining competitors
-    remaining_competitors = [
-        comp_name for comp_name in competitors if comp_name not in fixed_positions
-    ]
+    # Work on groups by index so the hot loop only touches flat lists of ints
+    group_ids = list(groups)
+    group_list = list(groups.values())
+    group_index = {group_id: i for i, group_id in enumerate(group_ids)}
+    n_groups = len(group_ids)
 
-    # Group competitors by country
-    country_groups = defaultdict(list)
-    for comp_name in remaining_competitors:
-        country_groups[competitors[comp_name].country].append(comp_name)
-
-    # Sort countries by number of competitors (descending)
-    sorted_countries = sorted(
-        country_groups.items(), key=lambda x: len(x[1]), reverse=True
-    )
+    # Number of free positions left in each group
+    group_free = [len(group.free_positions) for group in group_list]
 
     # Track how many competitors from each country are in each group
-    country_group_counts = defaultdict(lambda: defaultdict(int))
+    country_group_counts: dict[int, list[int]] = {}
 
     # Initialize with fixed positions
     for comp_name, (group_id, position) in fixed_positions.items():
-        country = competitors[comp_name].country
+        group_counts = country_group_counts.setdefault(
+            country_of[comp_name], [0] * n_groups
+        )
         # Convert group_id to string for consistency
-        group_id_str = str(group_id)
-        country_group_counts[country][group_id_str] += 1
+        group_counts[group_index[str(group_id)]] += 1
 
     # For each country, distribute its competitors
     for country, comp_names in sorted_countries:
-        # Shuffle the competitors within this country for randomness
-        random.shuffle(comp_names)
+        # Shuffle a copy of the competitors within this country for randomness
+        comp_names = list(comp_names)
+        rng.shuffle(comp_names)
+        group_counts = country_group_counts.setdefault(country, [0] * n_groups)
 
         # For each competitor, find the best group
         for comp_name in comp_names:
@@ -170,130 +285,262 @@ def systematic_country_assignment(
             min_count = float("inf")
             best_groups = []
 
-            for group_id, group in groups.items():
-                # Count how many positions are still available in this group
-                available_positions = sum(
-                    1 for pos in group.positions if pos not in group.assigned_positions
-                )
-
-                if available_positions > 0:
-                    count = country_group_counts[country][group_id]
+            for g, count in enumerate(group_counts):
+                if count <= min_count and group_free[g]:
                     if count < min_count:
                         min_count = count
-                        best_groups = [group_id]
-                    elif count == min_count:
-                        best_groups.append(group_id)
+                        best_groups = [g]
+                    else:
+                        best_groups.append(g)
 
-            # Randomly select from the best groups
+            # Randomly select from the best groups. One draw over the collected ties
+            # is cheaper than reservoir sampling, which needs a draw per tie
             if best_groups:
-                selected_group_id = random.choice(best_groups)
-
-                # Find an available position in this group
-                available_positions = [
-                    pos
-                    for pos in groups[selected_group_id].positions
-                    if pos not in groups[selected_group_id].assigned_positions
-                ]
-
-                if available_positions:
-                    selected_position = random.choice(available_positions)
-
-                    # Assign the competitor
-                    assignment.assignments[(selected_group_id, selected_position)] = (
-                        comp_name
-                    )
-                    groups[selected_group_id].assigned_positions[
-                        selected_position
-                    ] = comp_name
-                    country_group_counts[country][selected_group_id] += 1
+                g = rng.choice(best_groups)
+                selected_group_id = group_ids[g]
+                selected_group = group_list[g]
+
+                # Pick an available position in this group
+                selected_position = rng.choice(selected_group.free_positions)
+                selected_group.free_positions.remove(selected_position)
+                group_free[g] -= 1
+
+                # Assign the competitor
+                assignment.assignments[(selected_group_id, selected_position)] = (
+                    comp_name
+                )
+                selected_group.assigned_positions[selected_position] = comp_name
+                group_counts[g] += 1
 
     # Now shuffle positions within each group (except fixed positions)
-    # Create a set of fixed position tuples for easy lookup
-    fixed_position_set = set((str(gid), pos) for gid, pos in fixed_positions.values())
-
     for group_id, group in groups.items():
-        # Get all positions in this group
-        group_positions = [(group_id, pos) for pos in group.positions]
-
-        # Separate fixed and non-fixed positions
-        fixed_positions_in_group = []
-        non_fixed_positions = []
-
-        for pos in group_positions:
-            if pos in fixed_position_set:
-                fixed_positions_in_group.append(pos)
-            else:
-                non_fixed_positions.append(pos)
-
-        # If there are non-fixed positions, shuffle the competitors among them
-        if non_fixed_positions:
-            # Get the competitors at these positions
-            competitors_at_positions = []
-            for pos in non_fixed_positions:
-                if pos in assignment.assignments:
-                    competitors_at_positions.append(assignment.assignments[pos])
-
-            # Only shuffle if we have the right number of competitors
-            if len(competitors_at_positions) == len(non_fixed_positions):
-                # Shuffle the competitors
-                random.shuffle(competitors_at_positions)
-
-                # Reassign them
-                for i, pos in enumerate(non_fixed_positions):
-                    assignment.assignments[pos] = competitors_at_positions[i]
+        # Non-fixed slots of this group, as (group_id, position) keys
+        fixed_in_group = fixed_by_group.get(group_id, ())
+        non_fixed_positions = [
+            (group_id, pos) for pos in group.positions if pos not in fixed_in_group
+        ]
+
+        # The group already knows who sits where, no need to search the assignment
+        competitors_at_positions = [
+            group.assigned_positions[pos]
+            for _, pos in non_fixed_positions
+            if pos in group.assigned_positions
+        ]
+
+        # Only shuffle if we have the right number of competitors
+        if competitors_at_positions and len(competitors_at_positions) == len(
+            non_fixed_positions
+        ):
+            rng.shuffle(competitors_at_positions)
+            assignment.assignments.update(
+                zip(non_fixed_positions, competitors_at_positions)
+            )
 
     # Calculate final collisions
     assignment.collision_count, assignment.per_country_collisions = (
-        calculate_collisions(assignment.assignments, competitors, groups)
+        calculate_collisions(country_group_counts)
     )
 
     return assignment
 
 
-def optimized_systematic_assignment(
-    competitors, groups, fixed_positions, random_seed=None, max_time_seconds=10
-):
+def min_possible_collisions(country_of, n_groups):
     """
-    Optimized algorithm that tries multiple systematic assignments with different random seeds.
+    Lower bound on the collisions of any assignment: each country spread as
+    evenly as possible over all groups, ignoring capacities and fixed positions.
     """
-    if random_seed is not None:
-        random.seed(random_seed)
+    country_sizes = {}
+    for country in country_of.values():
+        country_sizes[country] = country_sizes.get(country, 0) + 1
 
-    best_assignment = None
-    best_collision_count = float("inf")
+    lower_bound = 0
+    for size in country_sizes.values():
+        # Every group gets `share` competitors, `extra` groups get one more
+        share, extra = divmod(size, n_groups)
+        lower_bound += (n_groups - extra) * share * (share - 1) // 2
+        lower_bound += extra * (share + 1) * share // 2
+    return lower_bound
 
-    # Start time for timeout
-    start_time = time.time()
 
-    # Try multiple random permutations
-    max_attempts = (
-        100  # Fewer attempts needed since the systematic approach is more effective
-    )
-    for attempt in range(max_attempts):
-        # Check if we've exceeded the time limit
-        if time.time() - start_time > max_time_seconds:
-            break
+def run_attempts(
+    groups,
+    fixed_positions,
+    seeds,
+    deadline,
+    country_of,
+    fixed_by_group,
+    sorted_countries,
+    target_collisions=0,
+):
+    """
+    Run a batch of systematic assignments, one per seed, and return the best one.
+    Stops early once an assignment reaches target_collisions.
+    Executed inside a worker process by optimized_systematic_assignment.
+    """
+    best_assignment = None
+    search_complete = True
 
-        # Create fresh copies of groups for each attempt
-        fresh_groups = {}
-        for group_id, group in groups.items():
-            fresh_groups[group_id] = Group(group.id, group.capacity, group.label)
+    for current_seed in seeds:
+        # Always finish at least one attempt, then respect the time limit
+        if best_assignment is not None and time.time() > deadline:
+            search_complete = False
+            break
 
-        # Generate a new assignment with a different seed
-        current_seed = random_seed + attempt if random_seed is not None else None
+        # The same groups are reused, each attempt resets them first
         current_assignment = systematic_country_assignment(
-            competitors, fresh_groups, fixed_positions, current_seed
+            groups,
+            fixed_positions,
+            current_seed,
+            country_of,
+            fixed_by_group,
+            sorted_countries,
         )
 
         # Update best assignment if this is better
-        if current_assignment.collision_count < best_collision_count:
+        if (
+            best_assignment is None
+            or current_assignment.collision_count < best_assignment.collision_count
+        ):
             best_assignment = current_assignment
-            best_collision_count = current_assignment.collision_count
 
-            # If we found a perfect assignment (no collisions), we can stop
-            if current_assignment.collision_count == 0:
+            # If we reached the best possible assignment, we can stop
+            if current_assignment.collision_count <= target_collisions:
                 break
 
+    best_assignment.search_complete = search_complete
+    return best_assignment
+
+
+def replace_broken_draw_pool(broken_pool):
+    """
+    Swap in a fresh worker pool once a dead worker has broken broken_pool.
+    """
+    global DRAW_POOL
+    with DRAW_POOL_LOCK:
+        # Another draw may have replaced it already
+        if DRAW_POOL is broken_pool:
+            DRAW_POOL = ProcessPoolExecutor(max_workers=os.cpu_count())
+    broken_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def optimized_systematic_assignment(
+    groups,
+    fixed_positions,
+    random_seed,
+    max_time_seconds,
+    country_of,
+    fixed_by_group,
+    sorted_countries,
+):
+    """
+    Optimized algorithm that tries multiple systematic assignments with different random seeds.
+    Attempts are split into batches of consecutive seeds and run in parallel worker processes.
+    """
+    # Deadline for timeout, checked by the workers between attempts
+    start_time = time.time()
+    deadline = start_time + max_time_seconds
+
+    # Try multiple random permutations
+    max_attempts = (
+        100  # Fewer attempts needed since the systematic approach is more effective
+    )
+    seeds = [
+        random_seed + attempt if random_seed is not None else None
+        for attempt in range(max_attempts)
+    ]
+
+    best_assignment = None
+    best_batch = None
+    batches = range(0, max_attempts, ATTEMPTS_PER_TASK)
+    # Batches that returned after trying all their seeds or reaching the bound
+    complete_batches = set()
+
+    # No attempt can beat this, so reaching it ends the search
+    lower_bound = min_possible_collisions(country_of, len(groups))
+
+    pool = DRAW_POOL
+    futures = {}
+    try:
+        for batch in batches:
+            future = pool.submit(
+                run_attempts,
+                groups,
+                fixed_positions,
+                seeds[batch : batch + ATTEMPTS_PER_TASK],
+                deadline,
+                country_of,
+                fixed_by_group,
+                sorted_countries,
+                lower_bound,
+            )
+            futures[future] = batch
+
+        # The pool is shared, so batches may queue behind other draws;
+        # stop waiting shortly after the deadline
+        timeout = max(deadline - time.time(), 0) + DRAW_GRACE_SECONDS
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                if future.cancelled():
+                    continue
+
+                batch = futures[future]
+                current_assignment = future.result()
+                if current_assignment.search_complete:
+                    complete_batches.add(batch)
+
+                # Ties go to the lowest seed so the result matches a sequential run
+                if best_assignment is None or (
+                    current_assignment.collision_count,
+                    batch,
+                ) < (best_assignment.collision_count, best_batch):
+                    best_assignment = current_assignment
+                    best_batch = batch
+
+                if time.time() > deadline:
+                    # Out of time, drop every batch that has not started yet
+                    for pending in futures:
+                        pending.cancel()
+                elif best_assignment.collision_count <= lower_bound:
+                    # No later batch can do better than the lower bound
+                    for pending, pending_batch in futures.items():
+                        if pending_batch > best_batch:
+                            pending.cancel()
+        except TimeoutError:
+            pass
+    except BrokenProcessPool:
+        # A worker died; later draws get a new pool, this one runs in-process
+        replace_broken_draw_pool(pool)
+        best_assignment = None
+    finally:
+        # Free the shared pool of any batches this draw no longer needs
+        for pending in futures:
+            pending.cancel()
+
+    if best_assignment is None:
+        # No batch came back, so run the attempts here on this draw's own
+        # groups; past the deadline this still completes one attempt. The
+        # pool's attempts were lost, so the result is never a full search
+        best_assignment = run_attempts(
+            groups,
+            fixed_positions,
+            seeds,
+            deadline,
+            country_of,
+            fixed_by_group,
+            sorted_countries,
+            lower_bound,
+        )
+        best_assignment.search_complete = False
+    else:
+        # The result only matches a full sequential run if every batch that
+        # could have produced it finished; once the lower bound is reached,
+        # later batches do not matter
+        best_assignment.search_complete = all(
+            batch in complete_batches
+            for batch in batches
+            if batch <= best_batch or best_assignment.collision_count > lower_bound
+        )
+
     return best_assignment
 
 
@@ -304,23 +551,64 @@ def improved_assign_competitors(
     random_seed=None,
     minimization=True,
     max_time_seconds=10,
+    competitor_table=None,
 ):
     """
     Improved algorithm that uses systematic country distribution with optimization.
     """
-    if random_seed is not None:
-        random.seed(random_seed)
+    if competitor_table is None:
+        competitor_table = CompetitorTable(competitors)
+
+    # Competitor countries are looked up on every placement and collision count
+    country_of = competitor_table.country_of
+
+    # Competitors grouped by country and fixed positions grouped by group
+    # do not change between attempts either
+    sorted_countries = sort_countries(competitor_table, fixed_positions)
+    fixed_by_group = group_fixed_positions(fixed_positions)
+
+    # The stored groups are shared between requests, so every draw fills its
+    # own copies; attempts within the draw then reuse these via Group.reset()
+    groups = {
+        group_id: Group(group.id, group.capacity, group.label)
+        for group_id, group in groups.items()
+    }
 
     # If minimization is off, just use a single systematic assignment
     if not minimization:
-        return systematic_country_assignment(
-            competitors, groups, fixed_positions, random_seed
+        assignment = systematic_country_assignment(
+            groups,
+            fixed_positions,
+            random_seed,
+            country_of,
+            fixed_by_group,
+            sorted_countries,
+        )
+    else:
+        # Otherwise, try multiple assignments to find the best one
+        assignment = optimized_systematic_assignment(
+            groups,
+            fixed_positions,
+            random_seed,
+            max_time_seconds,
+            country_of,
+            fixed_by_group,
+            sorted_countries,
         )
 
-    # Otherwise, try multiple assignments to find the best one
-    return optimized_systematic_assignment(
-        competitors, groups, fixed_positions, random_seed, max_time_seconds
-    )
+    # Attempts count collisions by country index, report them by country
+    assignment.per_country_collisions = {
+        competitor_table.country_vocab[country_idx]: pairs
+        for country_idx, pairs in assignment.per_country_collisions.items()
+    }
+    return assignment
+
+
+def hash_key(values):
+    """
+    Short, stable hash of a tuple of plain values, used as the key for stored data.
+    """
+    return hashlib.blake2b(pickle.dumps(values, protocol=5), digest_size=16).hexdigest()
 
 
 def format_assignment_output(assignment, competitors, groups):
@@ -343,13 +631,45 @@ def format_summary_output(assignment):
         "total_collisions": assignment.collision_count,
         "per_country_collisions": dict(assignment.per_country_collisions),
         "random_seed": assignment.random_seed,
+        "search_complete": assignment.search_complete,
     }
 
 
+def known_upload_response(store):
+    """
+    Response for an upload whose hash the client already has, or None.
+    Clients may send the hash from an earlier upload in the X-Upload-Hash header
+    with an empty body; if it is still stored nothing is parsed or re-hashed.
+    A request with a body is always processed as a normal upload.
+    """
+    data_hash = request.headers.get("X-Upload-Hash")
+    if not data_hash or request.get_data():
+        return None
+
+    data = store.get(data_hash)
+    if data is None:
+        return None
+
+    return jsonify({"status": "success", "count": len(data), "hash": data_hash})
+
+
+def stored_result_response(stored):
+    """
+    JSON response for a stored draw result, reusing the body serialized at draw time.
+    """
+    _, body = stored
+    return Response(body, mimetype="application/json")
+
+
 # API endpoints
 @app.route("/api/competitors", methods=["POST"])
 def upload_competitors():
     try:
+        # Re-uploads of data the server still has skip parsing and hashing
+        known = known_upload_response(competitors_data)
+        if known is not None:
+            return known
+
         data = request.get_json()
         if not data:
             return jsonify({"error": "No data provided"}), 400
@@ -365,8 +685,13 @@ def upload_competitors():
                 name, name, comp.get("country", ""), comp.get("seed_id")
             )
 
-        data_hash = hashlib.md5(json.dumps(data, sort_keys=True).encode()).hexdigest()
+        data_hash = hash_key(
+            tuple(
+                (comp.name, comp.country, comp.seed_id) for comp in competitors.values()
+            )
+        )
         competitors_data[data_hash] = competitors
+        competitor_tables[data_hash] = CompetitorTable(competitors)
         return jsonify(
             {"status": "success", "count": len(competitors), "hash": data_hash}
         )
@@ -377,6 +702,11 @@ def upload_competitors():
 @app.route("/api/groups", methods=["POST"])
 def upload_groups():
     try:
+        # Re-uploads of data the server still has skip parsing and hashing
+        known = known_upload_response(groups_data)
+        if known is not None:
+            return known
+
         data = request.get_json()
         if not data:
             return jsonify({"error": "No data provided"}), 400
@@ -401,7 +731,9 @@ def upload_groups():
             # Convert group_id to string for consistency
             groups[str(grp_id)] = Group(grp_id, capacity, grp.get("label"))
 
-        data_hash = hashlib.md5(json.dumps(data, sort_keys=True).encode()).hexdigest()
+        data_hash = hash_key(
+            tuple((grp.id, grp.capacity, grp.label) for grp in groups.values())
+        )
         groups_data[data_hash] = groups
         return jsonify({"status": "success", "count": len(groups), "hash": data_hash})
     except Exception as e:
@@ -411,6 +743,11 @@ def upload_groups():
 @app.route("/api/fixed", methods=["POST"])
 def upload_fixed_positions():
     try:
+        # Re-uploads of data the server still has skip parsing and hashing
+        known = known_upload_response(fixed_positions_data)
+        if known is not None:
+            return known
+
         data = request.get_json()
         if not data:
             return jsonify({"error": "No data provided"}), 400
@@ -427,7 +764,12 @@ def upload_fixed_positions():
             # Convert group_id to string to ensure consistency
             fixed_positions[comp_name] = (str(group_id), position)
 
-        data_hash = hashlib.md5(json.dumps(data, sort_keys=True).encode()).hexdigest()
+        data_hash = hash_key(
+            tuple(
+                (comp_name, group_id, position)
+                for comp_name, (group_id, position) in fixed_positions.items()
+            )
+        )
         fixed_positions_data[data_hash] = fixed_positions
         return jsonify(
             {"status": "success", "count": len(fixed_positions), "hash": data_hash}
@@ -453,12 +795,46 @@ def run_draw():
         if not competitors_hash or not groups_hash:
             return jsonify({"error": "Missing competitors or groups hash"}), 400
 
-        if competitors_hash not in competitors_data or groups_hash not in groups_data:
+        # Read each store once; an entry can be evicted between two lookups
+        competitors = competitors_data.get(competitors_hash)
+        groups = groups_data.get(groups_hash)
+        if competitors is None or groups is None:
             return jsonify({"error": "Invalid competitors or groups hash"}), 400
 
-        competitors = competitors_data[competitors_hash]
-        groups = groups_data[groups_hash]
-        fixed_positions = fixed_positions_data.get(fixed_positions_hash, {})
+        fixed_positions = {}
+        if fixed_positions_hash:
+            fixed_positions = fixed_positions_data.get(fixed_positions_hash)
+            if fixed_positions is None:
+                return jsonify({"error": "Invalid fixed positions hash"}), 400
+
+        result_hash = hash_key(
+            (
+                competitors_hash,
+                groups_hash,
+                fixed_positions_hash,
+                random_seed,
+                minimization,
+                max_time,
+            )
+        )
+
+        # A seeded draw on the same inputs always gives the same result, so reuse
+        # it, unless a time limit cut that draw short
+        stored = assignment_results.get(result_hash)
+        cached = stored[0] if stored is not None else None
+        if (
+            random_seed is not None
+            and cached is not None
+            and cached["summary"]["search_complete"]
+        ):
+            return jsonify(
+                {
+                    "status": "success",
+                    "result_hash": result_hash,
+                    "assignment": cached["assignment"],
+                    "summary": cached["summary"],
+                }
+            )
 
         # Validate inputs
         is_valid, error_msg = validate_inputs(competitors, groups, fixed_positions)
@@ -467,32 +843,27 @@ def run_draw():
 
         # Run assignment with improved algorithm
         assignment = improved_assign_competitors(
-            competitors, groups, fixed_positions, random_seed, minimization, max_time
+            competitors,
+            groups,
+            fixed_positions,
+            random_seed,
+            minimization,
+            max_time,
+            competitor_tables.get(competitors_hash),
         )
 
         # Format output
         assignment_output = format_assignment_output(assignment, competitors, groups)
         summary_output = format_summary_output(assignment)
 
-        result_hash = hashlib.md5(
-            json.dumps(
-                {
-                    "competitors_hash": competitors_hash,
-                    "groups_hash": groups_hash,
-                    "fixed_positions_hash": fixed_positions_hash,
-                    "random_seed": random_seed,
-                    "minimization": minimization,
-                    "max_time_seconds": max_time,
-                },
-                sort_keys=True,
-            ).encode()
-        ).hexdigest()
-
-        assignment_results[result_hash] = {
+        result = {
             "assignment": assignment_output,
             "summary": summary_output,
             "timestamp": datetime.now().isoformat(),
         }
+        # Serialize once here; storing the body with the result means a rerun
+        # under the same hash replaces both together
+        assignment_results[result_hash] = (result, app.json.dumps(result))
 
         return jsonify(
             {
@@ -508,41 +879,49 @@ def run_draw():
 
 @app.route("/api/results/<result_hash>", methods=["GET"])
 def get_results(result_hash):
-    if result_hash not in assignment_results:
+    stored = assignment_results.get(result_hash)
+    if stored is None:
         return jsonify({"error": "Result not found"}), 404
 
-    return jsonify(assignment_results[result_hash])
+    return stored_result_response(stored)
 
 
 @app.route("/api/results/<result_hash>/export", methods=["GET"])
 def export_results(result_hash):
-    if result_hash not in assignment_results:
+    stored = assignment_results.get(result_hash)
+    if stored is None:
         return jsonify({"error": "Result not found"}), 404
 
     format_type = request.args.get("format", "json")
-    result = assignment_results[result_hash]
+    result, _ = stored
 
     if format_type == "csv":
-        # Create CSV for assignment
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(["Group ID", "Position", "Competitor Name", "Country"])
-        for item in result["assignment"]:
-            writer.writerow(
-                [item["group_id"], item["position"], item["name"], item["country"]]
-            )
+        # Stream the CSV one row at a time, reusing a single small buffer
+        def generate_csv():
+            output = io.StringIO()
+            writer = csv.writer(output)
+            writer.writerow(["Group ID", "Position", "Competitor Name", "Country"])
+            for item in result["assignment"]:
+                # Send the previous row before writing the next one
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate(0)
+                writer.writerow(
+                    [item["group_id"], item["position"], item["name"], item["country"]]
+                )
+            yield output.getvalue()
 
         # Create a response with the CSV file
-        output.seek(0)
-        return send_file(
-            path_or_file=io.BytesIO(output.getvalue().encode("utf-8")),
+        return Response(
+            generate_csv(),
             mimetype="text/csv",
-            as_attachment=True,
-            download_name=f"kendo_assignment_{result_hash}.csv",
+            headers={
+                "Content-Disposition": f"attachment; filename=kendo_assignment_{result_hash}.csv"
+            },
         )
     else:
         # Return JSON
-        return jsonify(result)
+        return stored_result_response(stored)
 
 
 @app.route("/api/validate", methods=["POST"])
@@ -559,12 +938,17 @@ def validate_inputs_endpoint():
         if not competitors_hash or not groups_hash:
             return jsonify({"error": "Missing competitors or groups hash"}), 400
 
-        if competitors_hash not in competitors_data or groups_hash not in groups_data:
+        # Read each store once; an entry can be evicted between two lookups
+        competitors = competitors_data.get(competitors_hash)
+        groups = groups_data.get(groups_hash)
+        if competitors is None or groups is None:
             return jsonify({"error": "Invalid competitors or groups hash"}), 400
 
-        competitors = competitors_data[competitors_hash]
-        groups = groups_data[groups_hash]
-        fixed_positions = fixed_positions_data.get(fixed_positions_hash, {})
+        fixed_positions = {}
+        if fixed_positions_hash:
+            fixed_positions = fixed_positions_data.get(fixed_positions_hash)
+            if fixed_positions is None:
+                return jsonify({"error": "Invalid fixed positions hash"}), 400
 
         # Validate inputs
         is_valid, error_msg = validate_inputs(competitors, groups, fixed_positions)